@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 """Media Mirror Dashboard — Web server for monitoring and controlling the pipeline."""
+import collections
+import concurrent.futures
+import gzip
 import http.server
 import json
 import os
+import select
 import signal
 import subprocess
-import socketserver
+import threading
+import time
 import urllib.parse
 import datetime
 
@@ -16,27 +21,137 @@ CONFIG_FILE = os.environ.get("CONFIG_FILE", "/opt/media-mirror/config.env")
 INSTALL_DIR = os.environ.get("INSTALL_DIR", "/opt/media-mirror")
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
+EVENTS_INTERVAL = 1.0  # seconds between /api/events change checks
+EVENTS_HEARTBEAT = 5.0  # seconds of no changes before a timestamp-only event
+
+ACTIVE_STATUSES = frozenset(("converting", "transferring", "queued"))
+
+# (dashboard name, config.env key, default) for every editable setting. Drives
+# both the "config" block of /api/status and the POST /api/config key mapping.
+CONFIG_FIELDS = (
+    ("source_movies", "SOURCE_MOVIES", ""),
+    ("source_tv", "SOURCE_TV", ""),
+    ("dest_host", "DEST_HOST", ""),
+    ("dest_movies", "DEST_MOVIES", ""),
+    ("dest_tv", "DEST_TV", ""),
+    ("temp_dir", "TEMP_DIR", ""),
+    ("dest_ssh_key", "DEST_SSH_KEY", ""),
+    ("target_height", "TARGET_HEIGHT", "720"),
+    ("ffmpeg_crf", "FFMPEG_CRF", "23"),
+    ("ffmpeg_preset", "FFMPEG_PRESET", "medium"),
+    ("ffmpeg_threads", "FFMPEG_THREADS", "4"),
+    ("rsync_bwlimit", "RSYNC_BWLIMIT", "100000"),
+    ("scan_interval", "SCAN_INTERVAL", "3600"),
+    ("dashboard_port", "DASHBOARD_PORT", "8080"),
+    ("adaptive_resolution", "ADAPTIVE_RESOLUTION", "1"),
+    ("resolution_ladder", "RESOLUTION_LADDER", "1080 720 480 360 240"),
+    ("min_dest_free_gb", "MIN_DEST_FREE_GB", "20"),
+)
+KEY_MAP = {f: k for f, k, _ in CONFIG_FIELDS}
+
+# orjson is optional: it parses/serializes the (potentially large) state file
+# several times faster than stdlib json. Both paths deal in bytes.
+try:
+    import orjson
+
+    loads = orjson.loads
+    JSONDecodeError = orjson.JSONDecodeError
+
+    def dumps(obj):
+        return orjson.dumps(obj)
+except ImportError:
+    loads = json.loads
+    JSONDecodeError = json.JSONDecodeError
+
+    def dumps(obj):
+        return json.dumps(obj).encode()
+
+
+# Parsed file contents keyed by path -> ((mtime_ns, size), value). The dashboard
+# polls every few seconds but state/config only change when the runner or a
+# settings save rewrites them, so most polls can skip the re-parse.
+_file_cache = {}
+
+
+def _cached_read(path, parse):
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    hit = _file_cache.get(path)
+    if hit and hit[0] == key:
+        return hit[1]
+    value = parse(path)
+    _file_cache[path] = (key, value)
+    return value
+
+
+def _invalidate(path):
+    _file_cache.pop(path, None)
+
+
+def _parse_state(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
 
 def read_state():
     try:
-        with open(STATE_FILE, "r") as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {"jobs": [], "stats": {}, "runner": {"status": "unknown", "paused": False}}
+        return _cached_read(STATE_FILE, _parse_state)
+    except JSONDecodeError:
+        # The runner rewrites state.json in place, so a read can land mid-write;
+        # keep serving the last good parse rather than a blank state
+        hit = _file_cache.get(STATE_FILE)
+        if hit:
+            return hit[1]
+    except FileNotFoundError:
+        pass
+    return {"jobs": [], "stats": {}, "runner": {"status": "unknown", "paused": False}}
 
 
-def read_config():
+def _atomic_write_json(path, obj):
+    """Write `obj` to `path` via a temp file + rename so the runner never reads a half-written file."""
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(dumps(obj))
+    os.replace(tmp, path)
+    _invalidate(path)
+
+
+def set_paused(paused):
+    """Set runner.paused in state.json. Parses the file directly rather than via
+    read_state() so a missing or half-written file (the runner rewrites it in
+    place) returns False instead of writing an empty job history back."""
+    try:
+        state = _parse_state(STATE_FILE)
+    except (FileNotFoundError, JSONDecodeError):
+        return False
+    state.setdefault("runner", {})["paused"] = paused
+    _atomic_write_json(STATE_FILE, state)
+    return True
+
+
+def _read_static(path):
+    """Static asset as (raw, gzipped) bytes; cached by _cached_read until it changes."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    return raw, gzip.compress(raw)
+
+
+def _parse_config(path):
     config = {}
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#") and "=" in line:
+                key, _, val = line.partition("=")
+                config[key.strip()] = val.strip().strip('"').strip("'")
+    return config
+
+
+def read_config():
     try:
-        with open(CONFIG_FILE, "r") as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#") and "=" in line:
-                    key, _, val = line.partition("=")
-                    config[key.strip()] = val.strip().strip('"').strip("'")
+        return _cached_read(CONFIG_FILE, _parse_config)
     except FileNotFoundError:
-        pass
-    return config
+        return {}
 
 
 def write_config(updates):
@@ -67,25 +182,93 @@ def write_config(updates):
 
     with open(CONFIG_FILE, "w") as f:
         f.writelines(new_lines)
-
-
-def get_disk_usage():
-    disks = {}
-    config = read_config()
+    _invalidate(CONFIG_FILE)
+
+
+def _human(n):
+    """Compact size in the style of `df -h` (1024-based, e.g. 931G, 1.8T)."""
+    for unit in ("B", "K", "M", "G", "T"):
+        if n < 1024:
+            break
+        n /= 1024
+    else:
+        unit = "P"
+    return f"{n:.1f}{unit}" if n < 10 and unit != "B" else f"{n:.0f}{unit}"
+
+
+def _statvfs_info(path):
+    """Local disk usage for `path`, same fields as a parsed `df -h` row."""
+    st = os.statvfs(path)
+    used = (st.f_blocks - st.f_bfree) * st.f_frsize
+    avail = st.f_bavail * st.f_frsize
+    mount = os.path.realpath(path)
+    while not os.path.ismount(mount):
+        mount = os.path.dirname(mount)
+    # df reports capacity against what non-root users can actually use
+    pct = -(-used * 100 // (used + avail)) if used + avail else 0
+    return {"mount": mount, "size": _human(st.f_blocks * st.f_frsize), "used": _human(used),
+            "avail": _human(avail), "pct": f"{pct}%"}
+
+
+# Reuse one multiplexed SSH connection for the per-poll `df` probes so only the
+# first poll pays for the TCP + key exchange + auth handshake.
+SSH_MUX_OPTS = [
+    "-T", "-o", "BatchMode=yes",
+    "-o", "ControlMaster=auto",
+    # Private dir (not world-writable /tmp); %C is a fixed-length hash, which
+    # keeps the socket path under macOS's 104-byte limit
+    "-o", f"ControlPath={INSTALL_DIR}/ssh-mux-%C",
+    "-o", "ControlPersist=600",
+]
+
+
+def _ssh_df_info(dest_host, dest_key, dpath):
+    """Remote disk usage for `dpath` on the destination via `ssh df`."""
+    result = subprocess.run(
+        ["ssh", "-i", dest_key, "-o", "StrictHostKeyChecking=no", "-o", "ConnectTimeout=3",
+         *SSH_MUX_OPTS, dest_host, f"df -Ph '{dpath}'"],
+        # The detached master inherits stderr; a pipe there would hold this
+        # call open until the timeout.
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=8
+    )
+    if result.returncode == 0:
+        lines = result.stdout.strip().split("\n")
+        if len(lines) > 1:
+            parts = lines[1].split()
+            return {"mount": f"{dest_host}:{parts[-1]}", "size": parts[1], "used": parts[2], "avail": parts[3], "pct": parts[4]}
+    return None
+
+
+# Disk probes are independent blocking waits (statvfs on a possibly-networked
+# source, ssh round trips), so run them side by side: a status poll then costs
+# the slowest probe rather than the sum of all of them.
+_disk_pool = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="disk")
+
+# Probe futures by (label, args). os.statvfs has no timeout, so a hung SMB/NFS
+# source holds its worker indefinitely; later polls reuse that future instead
+# of queueing more probes until every worker is stuck behind the same mount.
+_probe_inflight = {}
+_probe_lock = threading.Lock()
+
+
+def _submit_probe(label, fn, *args):
+    key = (label, args)
+    with _probe_lock:
+        for stale in [k for k, f in _probe_inflight.items() if f.done() and k != key]:
+            del _probe_inflight[stale]
+        fut = _probe_inflight.get(key)
+        if fut is None or fut.done():
+            fut = _probe_inflight[key] = _disk_pool.submit(fn, *args)
+    return fut
+
+
+def _probe_disks(config):
+    probes = {}
 
     # Local disks (source + temp)
     for label, path in [("source", config.get("SOURCE_MOVIES", "")), ("temp", config.get("TEMP_DIR", ""))]:
-        if not path:
-            continue
-        try:
-            result = subprocess.run(["df", "-h", path], capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                lines = result.stdout.strip().split("\n")
-                if len(lines) > 1:
-                    parts = lines[1].split()
-                    disks[label] = {"mount": parts[-1], "size": parts[1], "used": parts[2], "avail": parts[3], "pct": parts[4]}
-        except Exception:
-            pass
+        if path:
+            probes[label] = _submit_probe(label, _statvfs_info, path)
 
     # Remote disks (movies + tv destinations)
     dest_host = config.get("DEST_HOST", "")
@@ -93,31 +276,191 @@ def get_disk_usage():
     for dlabel, dpath_key in [("dest_movies", "DEST_MOVIES"), ("dest_tv", "DEST_TV")]:
         dpath = config.get(dpath_key, "")
         if dest_host and dest_key and dpath:
-            try:
-                result = subprocess.run(
-                    ["ssh", "-i", dest_key, "-o", "StrictHostKeyChecking=no", "-o", "ConnectTimeout=3",
-                     dest_host, f"df -h '{dpath}'"],
-                    capture_output=True, text=True, timeout=8
-                )
-                if result.returncode == 0:
-                    lines = result.stdout.strip().split("\n")
-                    if len(lines) > 1:
-                        parts = lines[1].split()
-                        disks[dlabel] = {"mount": f"{dest_host}:{parts[-1]}", "size": parts[1], "used": parts[2], "avail": parts[3], "pct": parts[4]}
-            except Exception:
-                pass
+            probes[dlabel] = _submit_probe(dlabel, _ssh_df_info, dest_host, dest_key, dpath)
+
+    # One deadline for the whole batch, so stuck probes don't add up
+    done, _ = concurrent.futures.wait(probes.values(), timeout=10)
+    disks = {}
+    for label, fut in probes.items():
+        if fut in done and fut.exception() is None and fut.result():
+            disks[label] = fut.result()
     return disks
 
 
+# Free space moves slowly, so probe results are reused for DISK_TTL seconds.
+# Once stale, callers get the previous value while one background thread
+# re-probes; a config change (new paths) makes callers wait for the re-probe.
+# Either way only one refresh runs at a time: concurrent callers (SSE streams,
+# polling tabs) share its "pending" future instead of probing again.
+DISK_TTL = 30
+_disk_cache = {"config": None, "t": 0.0, "disks": {}, "pending": None, "pending_config": None}
+_disk_lock = threading.Lock()
+
+
+def _refresh_disks(config, pending):
+    try:
+        disks = _probe_disks(config)
+    except Exception as e:
+        disks = {}
+        pending.set_exception(e)
+    with _disk_lock:
+        # A config change while probing starts a newer refresh; let that one win
+        if _disk_cache["pending"] is pending:
+            _disk_cache.update(config=config, t=time.monotonic(), disks=disks,
+                               pending=None, pending_config=None)
+    if not pending.done():
+        pending.set_result(disks)
+
+
+def get_disk_usage():
+    config = read_config()
+    with _disk_lock:
+        fresh = _disk_cache["config"] is config
+        if fresh and time.monotonic() - _disk_cache["t"] < DISK_TTL:
+            return _disk_cache["disks"]
+        pending = _disk_cache["pending"]
+        if pending is None or _disk_cache["pending_config"] is not config:
+            pending = concurrent.futures.Future()
+            _disk_cache.update(pending=pending, pending_config=config)
+            threading.Thread(target=_refresh_disks, args=(config, pending), daemon=True).start()
+        if fresh:
+            return _disk_cache["disks"]
+    try:
+        return pending.result()
+    except Exception:
+        return {}
+
+
+def tail_file(path, lines=50, chunk_size=4096, max_bytes=65536):
+    """Return the last `lines` lines of a file as bytes, reading back from EOF.
+
+    At most `max_bytes` are read: ffmpeg/rsync logs are mostly carriage-return
+    progress updates with few newlines, so past the cap the partial read is returned.
+    """
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        chunks = []
+        newlines = read = 0
+        # One extra newline so the oldest kept line is complete
+        while pos > 0 and newlines <= lines and read < max_bytes:
+            step = min(chunk_size, pos, max_bytes - read)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+            read += len(chunk)
+    buf = b"".join(reversed(chunks))
+    parts = buf.split(b"\n")
+    trailing = buf.endswith(b"\n")
+    if trailing:
+        parts.pop()
+    out = b"\n".join(parts[-lines:])
+    return out + b"\n" if trailing else out
+
+
+# Done jobs never change, so each one's duration is parsed from its ISO
+# timestamps once and reused across state changes. summarize_jobs() swaps in
+# only the entries it saw, so jobs dropped from state.json don't linger.
+_job_secs = {}
+
+
+def _job_duration(started, updated, seen):
+    key = (started, updated)
+    secs = _job_secs.get(key)
+    if secs is None:
+        start = datetime.datetime.fromisoformat(started)
+        end = datetime.datetime.fromisoformat(updated)
+        secs = (end - start).total_seconds()
+    seen[key] = secs
+    return secs
+
+
+# (state, summary) for the last state object summarized. read_state() hands back
+# the same object until state.json changes, so polls in between (other tabs,
+# a slow runner) reuse the summary instead of rescanning the job history.
+_summary_cache = (None, None)
+
+
+def summarize_jobs(state):
+    """Bucket state["jobs"] into what /api/status returns, in a single pass.
+
+    Only the first 50 active / 20 failed and the last 20 done jobs are kept.
+    The runner keeps a running per-file average in stats; it is recomputed
+    from job timestamps only for state files written before it did.
+    """
+    global _summary_cache, _job_secs
+    cached_state, summary = _summary_cache
+    if cached_state is state:
+        return summary
+
+    stats = state.get("stats", {})
+    runner_avg = stats.get("avg_per_file_secs") if stats.get("timed_done") else None
+    active, failed = [], []
+    recent_done = collections.deque(maxlen=20)
+    session_done = 0
+    times_sum, times_n, times_ok = 0.0, 0, runner_avg is None
+    durations = {}
+    for j in state["jobs"]:
+        status = j["status"]
+        if status in ACTIVE_STATUSES:
+            if len(active) < 50:
+                active.append(j)
+        elif status == "done":
+            recent_done.append(j)
+            session_done += 1
+            if times_ok and j.get("started") and j.get("updated"):
+                try:
+                    times_sum += _job_duration(j["started"], j["updated"], durations)
+                    times_n += 1
+                except (TypeError, ValueError):
+                    times_ok = False
+        elif status == "skipped":
+            session_done += 1
+        elif status == "failed":
+            if len(failed) < 20:
+                failed.append(j)
+
+    if runner_avg is not None:
+        avg_secs = runner_avg
+    else:
+        avg_secs = times_sum / times_n if times_n and times_ok else None
+    summary = {
+        "active": active,
+        "failed": failed,
+        "recent_done": list(recent_done),
+        "session_done": session_done,
+        "avg_secs": avg_secs,
+    }
+    _job_secs = durations
+    _summary_cache = (state, summary)
+    return summary
+
+
+# (pid file mtime_ns, monotonic time checked, pid) from the last liveness check;
+# reused for up to a second while the pid file is unchanged.
+_runner_pid_cache = (None, 0.0, None)
+
+
 def get_runner_pid():
+    global _runner_pid_cache
     pid_file = os.path.join(INSTALL_DIR, "runner.pid")
+    try:
+        mtime = os.stat(pid_file).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached_mtime, checked, cached_pid = _runner_pid_cache
+    now = time.monotonic()
+    if mtime == cached_mtime and now - checked < 1.0:
+        return cached_pid
     try:
         with open(pid_file, "r") as f:
             pid = int(f.read().strip())
         os.kill(pid, 0)  # Check if alive
-        return pid
     except (FileNotFoundError, ValueError, ProcessLookupError, PermissionError):
-        return None
+        pid = None
+    _runner_pid_cache = (mtime, now, pid)
+    return pid
 
 
 def start_runner():
@@ -135,16 +478,33 @@ def start_runner():
     return {"ok": True, "pid": proc.pid}
 
 
+def _kill_matching(pattern):
+    """SIGKILL every process whose command line contains `pattern` (pkill -9 -f)."""
+    if not os.path.isdir("/proc"):
+        # macOS has no procfs; fall back to pkill
+        try:
+            subprocess.run(["pkill", "-9", "-f", pattern], capture_output=True, timeout=5)
+        except Exception:
+            pass
+        return
+    needle = pattern.encode()
+    me = os.getpid()
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit() or int(entry.name) == me:
+            continue
+        try:
+            with open(f"/proc/{entry.name}/cmdline", "rb") as f:
+                cmdline = f.read().replace(b"\0", b" ")
+            if needle in cmdline:
+                os.kill(int(entry.name), signal.SIGKILL)
+        except OSError:
+            pass
+
+
 def stop_runner():
     # Kill ALL runner processes (not just the PID file one)
     pid = get_runner_pid()
-    try:
-        result = subprocess.run(
-            ["pkill", "-9", "-f", os.path.join(INSTALL_DIR, "media-mirror.sh")],
-            capture_output=True, timeout=5
-        )
-    except Exception:
-        pass
+    _kill_matching(os.path.join(INSTALL_DIR, "media-mirror.sh"))
     # Also try the PID file
     if pid:
         try:
@@ -160,95 +520,96 @@ def stop_runner():
     return {"ok": True, "stopped": pid or 0}
 
 
+def build_status():
+    """Everything the dashboard renders, as served by /api/status."""
+    state = read_state()
+    config = read_config()
+    disks = get_disk_usage()
+
+    summary = summarize_jobs(state)
+    avg_secs = summary["avg_secs"]
+    session_done = summary["session_done"]
+
+    # Calculate ETA from completed jobs
+    eta = {}
+    inventory = state.get("inventory", {})
+    if avg_secs is not None:
+        try:
+            # Use inventory scan for accurate totals
+            source_total = inventory.get("source_total", 0)
+            dest_done = inventory.get("dest_done", 0)
+            total_completed = dest_done + session_done
+            remaining = max(0, source_total - total_completed) if source_total else 0
+            eta = {
+                "avg_per_file_secs": round(avg_secs),
+                "source_total": source_total,
+                "completed": total_completed,
+                "remaining": remaining,
+                "est_remaining_hours": round(remaining * avg_secs / 3600, 1),
+                "est_remaining_days": round(remaining * avg_secs / 86400, 1),
+            }
+        except Exception:
+            pass
+
+    runner = state.get("runner", {})
+    return {
+        "runner": runner,
+        "runner_pid": get_runner_pid(),
+        "stats": state.get("stats", {}),
+        "eta": eta,
+        "inventory": inventory,
+        "resolution": {
+            "target_height": runner.get("target_height", config.get("TARGET_HEIGHT", "720")),
+            "effective_height": runner.get("effective_height", config.get("TARGET_HEIGHT", "720")),
+            "adaptive": config.get("ADAPTIVE_RESOLUTION", "1") == "1",
+            "downstepped": (
+                runner.get("effective_height") is not None
+                and runner.get("target_height") is not None
+                and int(runner.get("effective_height")) < int(runner.get("target_height"))
+            ),
+        },
+        "active_jobs": summary["active"],
+        "recent_done": summary["recent_done"],
+        "failed": summary["failed"],
+        "disks": disks,
+        "config": {f: config.get(k, d) for f, k, d in CONFIG_FIELDS},
+        "timestamp": datetime.datetime.now().isoformat(),
+    }
+
+
+def _wait_for_exit(pid, timeout=2.0):
+    """Poll until `pid` has exited (reaping it if it is our child), up to `timeout` seconds."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if os.waitpid(pid, os.WNOHANG)[0] == pid:
+                return
+        except ChildProcessError:
+            pass
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return
+        except PermissionError:
+            pass
+        time.sleep(0.05)
+
+
 class DashboardHandler(http.server.SimpleHTTPRequestHandler):
+    # Keep-alive: every response carries Content-Length (see _send_bytes), so
+    # polling tabs reuse one connection. Idle ones are dropped after `timeout`
+    # seconds so they don't sit on DashboardServer's thread slots.
+    protocol_version = "HTTP/1.1"
+    timeout = 15
+
     def do_GET(self):
         parsed = urllib.parse.urlparse(self.path)
 
         if parsed.path == "/api/status":
-            state = read_state()
-            config = read_config()
-            disks = get_disk_usage()
-
-            active = [j for j in state["jobs"] if j["status"] in ("converting", "transferring", "queued")]
-            recent_done = [j for j in state["jobs"] if j["status"] == "done"][-20:]
-            failed = [j for j in state["jobs"] if j["status"] == "failed"]
-
-            # Calculate ETA from completed jobs
-            eta = {}
-            done_jobs_with_times = [
-                j for j in state["jobs"]
-                if j["status"] == "done" and j.get("started") and j.get("updated")
-            ]
-            inventory = state.get("inventory", {})
-            if done_jobs_with_times:
-                try:
-                    times = []
-                    for j in done_jobs_with_times:
-                        start = datetime.datetime.fromisoformat(j["started"])
-                        end = datetime.datetime.fromisoformat(j["updated"])
-                        times.append((end - start).total_seconds())
-                    avg_secs = sum(times) / len(times)
-                    # Use inventory scan for accurate totals
-                    source_total = inventory.get("source_total", 0)
-                    dest_done = inventory.get("dest_done", 0)
-                    session_done = len([j for j in state["jobs"] if j["status"] in ("done", "skipped")])
-                    total_completed = dest_done + session_done
-                    remaining = max(0, source_total - total_completed) if source_total else 0
-                    eta = {
-                        "avg_per_file_secs": round(avg_secs),
-                        "source_total": source_total,
-                        "completed": total_completed,
-                        "remaining": remaining,
-                        "est_remaining_hours": round(remaining * avg_secs / 3600, 1),
-                        "est_remaining_days": round(remaining * avg_secs / 86400, 1),
-                    }
-                except Exception:
-                    pass
-
-            runner = state.get("runner", {})
-            response = {
-                "runner": runner,
-                "runner_pid": get_runner_pid(),
-                "stats": state.get("stats", {}),
-                "eta": eta,
-                "inventory": inventory,
-                "resolution": {
-                    "target_height": runner.get("target_height", config.get("TARGET_HEIGHT", "720")),
-                    "effective_height": runner.get("effective_height", config.get("TARGET_HEIGHT", "720")),
-                    "adaptive": config.get("ADAPTIVE_RESOLUTION", "1") == "1",
-                    "downstepped": (
-                        runner.get("effective_height") is not None
-                        and runner.get("target_height") is not None
-                        and int(runner.get("effective_height")) < int(runner.get("target_height"))
-                    ),
-                },
-                "active_jobs": active[:50],
-                "recent_done": recent_done,
-                "failed": failed[:20],
-                "disks": disks,
-                "config": {
-                    "source_movies": config.get("SOURCE_MOVIES", ""),
-                    "source_tv": config.get("SOURCE_TV", ""),
-                    "dest_host": config.get("DEST_HOST", ""),
-                    "dest_movies": config.get("DEST_MOVIES", ""),
-                    "dest_tv": config.get("DEST_TV", ""),
-                    "temp_dir": config.get("TEMP_DIR", ""),
-                    "dest_ssh_key": config.get("DEST_SSH_KEY", ""),
-                    "target_height": config.get("TARGET_HEIGHT", "720"),
-                    "ffmpeg_crf": config.get("FFMPEG_CRF", "23"),
-                    "ffmpeg_preset": config.get("FFMPEG_PRESET", "medium"),
-                    "ffmpeg_threads": config.get("FFMPEG_THREADS", "4"),
-                    "rsync_bwlimit": config.get("RSYNC_BWLIMIT", "100000"),
-                    "scan_interval": config.get("SCAN_INTERVAL", "3600"),
-                    "dashboard_port": config.get("DASHBOARD_PORT", "8080"),
-                    "adaptive_resolution": config.get("ADAPTIVE_RESOLUTION", "1"),
-                    "resolution_ladder": config.get("RESOLUTION_LADDER", "1080 720 480 360 240"),
-                    "min_dest_free_gb": config.get("MIN_DEST_FREE_GB", "20"),
-                },
-                "timestamp": datetime.datetime.now().isoformat(),
-            }
+            self._json_response(200, build_status())
 
-            self._json_response(200, response)
+        elif parsed.path == "/api/events":
+            self._stream_status()
 
         elif parsed.path == "/api/config":
             self._json_response(200, read_config())
@@ -265,25 +626,18 @@ class DashboardHandler(http.server.SimpleHTTPRequestHandler):
             try:
                 result = subprocess.run(cmd, capture_output=True, text=True, timeout=900)
                 if result.returncode == 0 and result.stdout.strip():
-                    self._json_response(200, json.loads(result.stdout))
+                    self._json_response(200, loads(result.stdout))
                 else:
                     self._json_response(500, {"ok": False, "error": result.stderr[-500:] or "estimate failed"})
             except Exception as e:
                 self._json_response(500, {"ok": False, "error": str(e)})
 
-        elif parsed.path == "/api/pause":
-            state = read_state()
-            state["runner"]["paused"] = True
-            with open(STATE_FILE, "w") as f:
-                json.dump(state, f)
-            self._json_response(200, {"ok": True, "paused": True})
-
-        elif parsed.path == "/api/resume":
-            state = read_state()
-            state["runner"]["paused"] = False
-            with open(STATE_FILE, "w") as f:
-                json.dump(state, f)
-            self._json_response(200, {"ok": True, "paused": False})
+        elif parsed.path in ("/api/pause", "/api/resume"):
+            paused = parsed.path == "/api/pause"
+            if set_paused(paused):
+                self._json_response(200, {"ok": True, "paused": paused})
+            else:
+                self._json_response(503, {"ok": False, "error": "State file unavailable, try again"})
 
         elif parsed.path == "/api/runner/start":
             self._json_response(200, start_runner())
@@ -292,36 +646,31 @@ class DashboardHandler(http.server.SimpleHTTPRequestHandler):
             self._json_response(200, stop_runner())
 
         elif parsed.path == "/api/runner/restart":
-            stop_runner()
-            import time; time.sleep(2)
+            stopped = stop_runner()["stopped"]
+            if stopped:
+                _wait_for_exit(stopped)
             self._json_response(200, start_runner())
 
         elif parsed.path.startswith("/api/log/"):
             filename = urllib.parse.unquote(parsed.path[9:])
-            path = os.path.join(LOG_DIR, filename)
+            log_root = os.path.realpath(LOG_DIR)
+            path = os.path.realpath(os.path.join(log_root, filename))
             try:
-                result = subprocess.run(["tail", "-50", path], capture_output=True, text=True, timeout=5)
-                self.send_response(200)
-                self.send_header("Content-Type", "text/plain")
-                self.end_headers()
-                self.wfile.write(result.stdout.encode())
-            except Exception:
-                self.send_response(404)
-                self.end_headers()
+                # Refuse anything that resolves outside LOG_DIR (../, symlinks)
+                if not path.startswith(log_root + os.sep):
+                    raise FileNotFoundError(path)
+                self._send_bytes(200, "text/plain", tail_file(path))
+            except OSError:
+                self._send_bytes(404, "text/plain", b"")
 
         elif parsed.path == "/" or parsed.path == "/index.html":
             html_path = os.path.join(SCRIPT_DIR, "index.html")
             try:
-                with open(html_path, "r") as f:
-                    content = f.read()
-                self.send_response(200)
-                self.send_header("Content-Type", "text/html")
-                self.end_headers()
-                self.wfile.write(content.encode())
+                content, content_gz = _cached_read(html_path, _read_static)
+                gzipped = self._accepts_gzip()
+                self._send_bytes(200, "text/html", content_gz if gzipped else content, gzipped)
             except FileNotFoundError:
-                self.send_response(404)
-                self.end_headers()
-                self.wfile.write(b"index.html not found")
+                self._send_bytes(404, "text/plain", b"index.html not found")
         else:
             super().do_GET()
 
@@ -332,52 +681,140 @@ class DashboardHandler(http.server.SimpleHTTPRequestHandler):
             length = int(self.headers.get("Content-Length", 0))
             body = self.rfile.read(length)
             try:
-                updates = json.loads(body)
-                # Map friendly names to config keys
-                key_map = {
-                    "source_movies": "SOURCE_MOVIES",
-                    "source_tv": "SOURCE_TV",
-                    "dest_host": "DEST_HOST",
-                    "dest_movies": "DEST_MOVIES",
-                    "dest_tv": "DEST_TV",
-                    "temp_dir": "TEMP_DIR",
-                    "dest_ssh_key": "DEST_SSH_KEY",
-                    "target_height": "TARGET_HEIGHT",
-                    "ffmpeg_crf": "FFMPEG_CRF",
-                    "ffmpeg_preset": "FFMPEG_PRESET",
-                    "ffmpeg_threads": "FFMPEG_THREADS",
-                    "rsync_bwlimit": "RSYNC_BWLIMIT",
-                    "scan_interval": "SCAN_INTERVAL",
-                    "dashboard_port": "DASHBOARD_PORT",
-                    "adaptive_resolution": "ADAPTIVE_RESOLUTION",
-                    "resolution_ladder": "RESOLUTION_LADDER",
-                    "min_dest_free_gb": "MIN_DEST_FREE_GB",
-                }
+                updates = loads(body)
                 mapped = {}
                 for k, v in updates.items():
-                    config_key = key_map.get(k, k)
+                    config_key = KEY_MAP.get(k, k)
                     mapped[config_key] = str(v)
                 write_config(mapped)
                 self._json_response(200, {"ok": True, "updated": list(mapped.keys())})
-            except (json.JSONDecodeError, Exception) as e:
+            except (JSONDecodeError, Exception) as e:
                 self._json_response(400, {"ok": False, "error": str(e)})
         else:
-            self.send_response(404)
-            self.end_headers()
+            self._send_bytes(404, "text/plain", b"")
+
+    def _stream_status(self):
+        """Server-Sent Events: one full status snapshot, then only the top-level
+        keys that changed, checked every EVENTS_INTERVAL seconds. A bare
+        timestamp is sent after EVENTS_HEARTBEAT seconds without changes."""
+        if not self.server.begin_stream():
+            self._json_response(503, {"ok": False, "error": "Too many open event streams"})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        # No Content-Length: the stream runs until either side closes it
+        self.send_header("Connection", "close")
+        self.close_connection = True
+        self.end_headers()
+        last = {}
+        quiet = 0.0
+        try:
+            self.wfile.write(b"retry: 5000\n\n")
+            while True:
+                status = build_status()
+                if last:
+                    delta = {k: v for k, v in status.items() if k != "timestamp" and last[k] != v}
+                    if delta:
+                        delta["timestamp"] = status["timestamp"]
+                else:
+                    delta = status
+                if delta:
+                    self.wfile.write(b"data: " + dumps(delta) + b"\n\n")
+                    last, quiet = status, 0.0
+                elif quiet >= EVENTS_HEARTBEAT:
+                    # Keeps the "updated" clock moving (and proxies from timing
+                    # out the stream) while the runner is idle
+                    self.wfile.write(b"data: " + dumps({"timestamp": status["timestamp"]}) + b"\n\n")
+                    quiet = 0.0
+                # Wait on the socket rather than sleeping: clients never send on
+                # an event stream, so readable + empty read means they hung up
+                # and the stream slot can be freed right away.
+                readable, _, _ = select.select([self.connection], [], [], EVENTS_INTERVAL)
+                if readable and not self.connection.recv(4096):
+                    return
+                quiet += EVENTS_INTERVAL
+        except (BrokenPipeError, ConnectionResetError):
+            pass
 
-    def _json_response(self, code, data):
+    def _accepts_gzip(self):
+        return "gzip" in self.headers.get("Accept-Encoding", "")
+
+    def _send_bytes(self, code, content_type, body, gzipped=False, headers=()):
+        """Send a complete body with Content-Length; `gzipped` marks it as gzip-encoded."""
         self.send_response(code)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Content-Type", content_type)
+        self.send_header("Vary", "Accept-Encoding")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        for key, val in headers:
+            self.send_header(key, val)
+        self.send_header("Content-Length", str(len(body)))
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode())
+        self.wfile.write(body)
+
+    def _json_response(self, code, data):
+        payload = dumps(data)
+        # Level 1 is several times faster than the default and still shrinks
+        # the job-heavy status payload by most of its size.
+        gzipped = len(payload) > 1024 and self._accepts_gzip()
+        if gzipped:
+            payload = gzip.compress(payload, compresslevel=1)
+        self._send_bytes(code, "application/json", payload, gzipped,
+                         (("Access-Control-Allow-Origin", "*"),))
 
     def log_message(self, format, *args):
         pass
 
 
+class DashboardServer(http.server.ThreadingHTTPServer):
+    """One thread per request so a slow `ssh df` or estimate run doesn't stall
+    every other open dashboard tab, capped at MAX_THREADS in flight.
+
+    /api/events streams stay open for the life of a tab, so they move off the
+    MAX_THREADS cap onto their own MAX_STREAMS slots (see begin_stream). Past
+    that, clients get a 503 and fall back to polling.
+    """
+    allow_reuse_address = True
+    daemon_threads = True
+    MAX_THREADS = 32
+    MAX_STREAMS = 4
+
+    def __init__(self, *args, **kwargs):
+        self._slots = threading.BoundedSemaphore(self.MAX_THREADS)
+        self._streams = threading.BoundedSemaphore(self.MAX_STREAMS)
+        self._local = threading.local()
+        super().__init__(*args, **kwargs)
+
+    def begin_stream(self):
+        """Trade the calling request's thread slot for a stream slot; False if none are free."""
+        if not self._streams.acquire(blocking=False):
+            return False
+        self._slots.release()
+        self._local.streaming = True
+        return True
+
+    def process_request(self, request, client_address):
+        # Blocks the accept loop while every slot is busy
+        self._slots.acquire()
+        try:
+            super().process_request(request, client_address)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        self._local.streaming = False
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            if self._local.streaming:
+                self._streams.release()
+            else:
+                self._slots.release()
+
+
 if __name__ == "__main__":
-    socketserver.TCPServer.allow_reuse_address = True
-    with socketserver.TCPServer(("0.0.0.0", PORT), DashboardHandler) as httpd:
+    with DashboardServer(("0.0.0.0", PORT), DashboardHandler) as httpd:
         print(f"Media Mirror Dashboard running on http://0.0.0.0:{PORT}")
         httpd.serve_forever()
@@ -77,13 +77,32 @@ for j in state['jobs']:
 if job is None:
     job = {'source': '''$file_path''', 'media_type': '$media_type', 'status': 'queued', 'progress': 0, 'detail': '', 'started': '', 'updated': ''}
     state['jobs'].append(job)
+stats = state['stats']
+if 'timed_done' not in stats:
+    # Seed the running per-file average (used for the dashboard ETA) from history
+    secs = []
+    for j in state['jobs']:
+        if j['status'] == 'done' and j.get('started') and j.get('updated'):
+            try:
+                secs.append((datetime.datetime.fromisoformat(j['updated']) - datetime.datetime.fromisoformat(j['started'])).total_seconds())
+            except ValueError:
+                pass
+    stats['timed_done'] = len(secs)
+    stats['avg_per_file_secs'] = sum(secs) / len(secs) if secs else 0
+prev_status = job['status']
 job['status'] = '$status'
 job['progress'] = $progress
 job['detail'] = '''$detail'''
 job['updated'] = datetime.datetime.now().isoformat()
 if '$status' == 'converting' and not job.get('started'):
     job['started'] = datetime.datetime.now().isoformat()
-stats = state['stats']
+if '$status' == 'done' and prev_status != 'done' and job.get('started'):
+    try:
+        secs = (datetime.datetime.fromisoformat(job['updated']) - datetime.datetime.fromisoformat(job['started'])).total_seconds()
+        stats['timed_done'] += 1
+        stats['avg_per_file_secs'] += (secs - stats['avg_per_file_secs']) / stats['timed_done']
+    except ValueError:
+        pass
 stats['total_files'] = len(state['jobs'])
 stats['converted'] = len([j for j in state['jobs'] if j['status'] in ('transferred','done')])
 stats['transferred'] = len([j for j in state['jobs'] if j['status'] == 'done'])